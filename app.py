@@ -1,13 +1,26 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
+import numpy as np
+import io
 import json
+import orjson
+import re
 import gspread
 from google.oauth2.service_account import Credentials
 from datetime import datetime, timedelta
-from openai import OpenAI
-import itertools
+import openai
+from openai import AsyncOpenAI
+import httpx
+import asyncio
+import concurrent.futures
+import threading
+import time
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 import jwt
+from cryptography import x509
 import os
 
 # ============================================================
@@ -19,20 +32,24 @@ st.set_page_config(page_title="Haru Blog Tool", layout="wide")
 # ============================================================
 # Firebase Config 読み込み（static/firebase_config.json）
 # ============================================================
+# セッション中に変わらないので、再実行のたびにディスクを読まないようキャッシュする
+# （キャッシュ関数では UI に触れず、エラーは例外で呼び出し側へ返す。
+# 例外はキャッシュされないので、ファイルを置けば次の再実行で読み込まれる）
+@st.cache_data
 def load_firebase_config():
     # Streamlit Cloud では、リポジトリのルートがカレントディレクトリになる想定
     base_dir = os.path.dirname(os.path.abspath(__file__))
     config_path = os.path.join(base_dir, "static", "firebase_config.json")
 
-    if not os.path.exists(config_path):
-        st.error("❌ firebase_config.json が見つかりません")
-        return None
-
     with open(config_path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
-firebase_config = load_firebase_config()
+try:
+    firebase_config = load_firebase_config()
+except FileNotFoundError:
+    firebase_config = None
+    st.error("❌ firebase_config.json が見つかりません")
 
 
 # ============================================================
@@ -55,16 +72,57 @@ def show_login_screen():
 # ============================================================
 # JWT 検証（Firebase ID Token）
 # ============================================================
+# Firebase ID トークンの署名に使われる Google の公開鍵（kid → X.509 証明書）
+FIREBASE_CERTS_URL = (
+    "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+)
+
+
+# 鍵は定期的にローテーションされるので、1時間ごとに取り直す
+@st.cache_resource(ttl=3600)
+def get_firebase_public_keys():
+    r = requests.get(FIREBASE_CERTS_URL, timeout=(5, 30))
+    r.raise_for_status()
+    return {
+        kid: x509.load_pem_x509_certificate(pem.encode()).public_key()
+        for kid, pem in r.json().items()
+    }
+
+
+# Streamlit は操作のたびにスクリプト全体を再実行し、同じトークンを何度も検証するため、
+# トークン文字列ごとに結果をキャッシュする。再実行ごとに関数が定義し直されるので、
+# functools.lru_cache ではなく再実行をまたいで残る st.cache_data を使う。
+# 失敗は例外になるのでキャッシュされない。有効期限切れのトークンを長く通さないよう TTL は短くする
+@st.cache_data(ttl=60, show_spinner=False)
+def decode_firebase_token(id_token: str, project_id: str):
+    kid = jwt.get_unverified_header(id_token).get("kid")
+    key = get_firebase_public_keys().get(kid)
+    if key is None:
+        # TTL 内に鍵がローテーションされた可能性があるので、1回だけ取り直す
+        get_firebase_public_keys.clear()
+        key = get_firebase_public_keys().get(kid)
+    if key is None:
+        raise jwt.InvalidKeyError(f"unknown kid: {kid}")
+
+    decoded = jwt.decode(
+        id_token,
+        key=key,
+        algorithms=["RS256"],
+        audience=project_id,
+        issuer=f"https://securetoken.google.com/{project_id}",
+        options={"require": ["exp", "iat", "sub"]},
+    )
+    # Firebase の ID トークンでは sub（ユーザー ID）は空でない文字列でなければならない
+    if not isinstance(decoded["sub"], str) or not decoded["sub"]:
+        raise jwt.InvalidTokenError("empty sub")
+    return decoded
+
+
 def verify_firebase_token(id_token: str | None):
-    if not id_token:
+    if not id_token or firebase_config is None:
         return None
     try:
-        decoded = jwt.decode(
-            id_token,
-            options={"verify_signature": False},
-            algorithms=["RS256"],
-        )
-        return decoded
+        return decode_firebase_token(id_token, firebase_config["projectId"])
     except Exception:
         return None
 
@@ -72,92 +130,162 @@ def verify_firebase_token(id_token: str | None):
 # ============================================================
 # WordPress 投稿の取得
 # ============================================================
-def fetch_wp_posts(wp_url, wp_user, wp_pass):
-    try:
-        all_posts = []
-        page = 1
-        per_page = 100
-
-        while True:
-            api_url = f"{wp_url.rstrip('/')}/wp-json/wp/v2/posts"
-            params = {
-                "per_page": per_page,
-                "page": page,
-                "orderby": "modified",
-                "order": "desc",
-                "_fields": "id,title,slug,link,status,date,modified,categories,tags,content",
-            }
-
-            r = requests.get(api_url, params=params, auth=(wp_user, wp_pass))
-
-            if r.status_code == 400:
-                break
-            if r.status_code != 200:
-                st.error(f"❌ WP取得エラー: {r.status_code} {r.text}")
-                return None
-
-            posts = r.json()
-            if not posts:
-                break
-
-            all_posts.extend(posts)
-
-            total_pages = r.headers.get("X-WP-TotalPages")
-            if total_pages is None or page >= int(total_pages):
-                break
-
-            page += 1
-
-        def strip_html(html):
-            import re
-            return re.sub(r"<[^>]+>", "", html or "").strip()
-
-        rows = []
-        for p in all_posts:
-            content_html = p.get("content", {}).get("rendered", "")
-            content_text = strip_html(content_html)
-            char_count = len(content_text)
-
-            rows.append({
-                "記事ID": p.get("id"),
-                "タイトル": p.get("title", {}).get("rendered", ""),
-                "スラッグ": p.get("slug", ""),
-                "URL": p.get("link", ""),
-                "ステータス": p.get("status", ""),
-                "公開日": p.get("date", ""),
-                "最終更新日": p.get("modified", ""),
-                "文字数": char_count
-            })
-
-        return pd.DataFrame(rows)
+# 本文の文字数計算用（HTML タグを除去する）
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+
+# WP REST API のフィールド → 出力列名
+WP_COLUMNS = {
+    "id": "記事ID",
+    "title.rendered": "タイトル",
+    "slug": "スラッグ",
+    "link": "URL",
+    "status": "ステータス",
+    "date": "公開日",
+    "modified": "最終更新日",
+}
+
+# ページの並列取得数（セッションの接続プールも同じ大きさにする）
+WP_FETCH_WORKERS = 8
+
+
+@st.cache_resource
+def get_wp_session():
+    # ページングのたびに TCP/TLS を張り直さないよう、keep-alive のセッションを共有する
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=WP_FETCH_WORKERS,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[502, 503, 504],
+            raise_on_status=False,
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class WPFetchError(Exception):
+    pass
+
+
+# 同じ入力での再取得を避ける。UI に触れないよう、エラーは例外で呼び出し側へ返す
+# （例外はキャッシュされないので、失敗した取得は次のクリックで再試行される）
+@st.cache_data(ttl=600, show_spinner=False)
+def _fetch_wp_posts(wp_url, wp_user, wp_pass, with_char_count=True):
+    session = get_wp_session()
+    api_url = f"{wp_url.rstrip('/')}/wp-json/wp/v2/posts"
+    # 本文（content.rendered）はレスポンスの大半を占めるので、文字数が要るときだけ取る
+    fields = ",".join(f.split(".")[0] for f in WP_COLUMNS)
+    if with_char_count:
+        fields += ",content"
+    params = {
+        "per_page": 100,
+        "orderby": "modified",
+        "order": "desc",
+        "context": "view",
+        "_fields": fields,
+    }
+
+    def get_page(page):
+        return session.get(
+            api_url,
+            params={**params, "page": page},
+            auth=(wp_user, wp_pass),
+            timeout=(5, 30),
+        )
+
+    # 1ページ目で総ページ数を知り、残りのページは並列で取得する
+    first = get_page(1)
+    responses = [first]
+
+    total_pages = first.headers.get("X-WP-TotalPages")
+    if first.status_code == 200 and total_pages is not None and int(total_pages) > 1:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=WP_FETCH_WORKERS) as ex:
+            # map は投入順に結果を返すので、ページ順（更新日の降順）が保たれる
+            responses.extend(ex.map(get_page, range(2, int(total_pages) + 1)))
+
+    all_posts = []
+    for r in responses:
+        if r.status_code == 400:
+            break
+        if r.status_code != 200:
+            raise WPFetchError(f"❌ WP取得エラー: {r.status_code} {r.text}")
+
+        posts = orjson.loads(r.content)
+        if not posts:
+            break
+
+        all_posts.extend(posts)
+
+    # 1件ずつ dict を組み立てず、まとめて平坦化してから列を選ぶ
+    raw = pd.json_normalize(all_posts).reindex(columns=[*WP_COLUMNS, "content.rendered"])
+
+    df = raw[list(WP_COLUMNS)].rename(columns=WP_COLUMNS)
+    df = df.fillna({c: "" for c in df.columns if c != "記事ID"})
+    if with_char_count:
+        df["文字数"] = (
+            raw["content.rendered"]
+            .fillna("")
+            .astype(str)
+            .str.replace(_HTML_TAG_RE, "", regex=True)
+            .str.strip()
+            .str.len()
+        )
+    return df
+
 
+def fetch_wp_posts(wp_url, wp_user, wp_pass, with_char_count=True):
+    try:
+        return _fetch_wp_posts(wp_url, wp_user, wp_pass, with_char_count), None
+    except WPFetchError as e:
+        return None, str(e)
     except Exception as e:
-        st.error(f"例外発生: {e}")
-        return None
+        return None, f"例外発生: {e}"
 
 
 # ============================================================
 # Google Sheets 書き込み
 # ============================================================
+@st.cache_resource
+def get_gspread_client():
+    # 認証情報の読み込みとトークン発行は重いので、プロセス内で使い回す
+    creds_dict = st.secrets["google_service_account"]
+    scopes = [
+        "https://www.googleapis.com/auth/spreadsheets",
+        "https://www.googleapis.com/auth/drive"
+    ]
+
+    credentials = Credentials.from_service_account_info(creds_dict, scopes=scopes)
+    return gspread.authorize(credentials)
+
+
+@st.cache_resource
+def get_spreadsheet(sheet_id):
+    return get_gspread_client().open_by_key(sheet_id)
+
+
 def write_to_sheets(df, sheet_id, worksheet_name):
     try:
-        creds_dict = st.secrets["google_service_account"]
-        scopes = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive"
-        ]
-
-        credentials = Credentials.from_service_account_info(creds_dict, scopes=scopes)
-        gc = gspread.authorize(credentials)
-        sh = gc.open_by_key(sheet_id)
+        sh = get_spreadsheet(sheet_id)
 
         try:
             ws = sh.worksheet(worksheet_name)
         except:
             ws = sh.add_worksheet(title=worksheet_name, rows="2000", cols="30")
 
-        ws.clear()
-        ws.update("A1", [df.columns.tolist()] + df.astype(str).values.tolist())
+        # clear() の代わりにシートを出力サイズへ合わせ、古いデータを一緒に落とす
+        ws.resize(rows=len(df) + 1, cols=max(len(df.columns), 1))
+        sh.values_batch_update({
+            "valueInputOption": "RAW",
+            "data": [{
+                "range": gspread.utils.absolute_range_name(ws.title, "A1"),
+                # NaN は JSON にできないので空文字にする（数値列は数値のまま送る）
+                "values": [df.columns.tolist()] + df.where(pd.notna(df), "").values.tolist(),
+            }],
+        })
         return True
 
     except Exception as e:
@@ -168,54 +296,294 @@ def write_to_sheets(df, sheet_id, worksheet_name):
 # ============================================================
 # SNS CSV生成
 # ============================================================
+# OpenAI のデフォルトの上限（1分あたりのリクエスト数 / トークン数）
+OPENAI_RPM = 60
+OPENAI_TPM = 150_000
+
+# 1リクエストあたりの出力トークン数の見込み
+OUTPUT_TOKENS_ESTIMATE = 300
+
+TIME_SLOTS = ["09:00", "12:00", "20:00"]
+
+SYSTEM_MSG = {"role": "system", "content": "あなたは優秀なSNSライターです"}
+
+TONE_TEXT = {
+    "丁寧": "丁寧で落ち着いたトーン",
+    "カジュアル": "カジュアルで親しみやすいトーン",
+}
+
+
+def estimate_tokens(prompt):
+    # 日本語はおおむね1文字1トークン以下なので、文字数を上限の見積もりとして使う
+    return len(SYSTEM_MSG["content"]) + len(prompt) + OUTPUT_TOKENS_ESTIMATE
+
+
+class TokenBucket:
+    """RPM / TPM の上限を見込んで送信を待たせる、クライアント側のレート制限。
+
+    429 を受けたら送信レートを半分に落とし、成功するたびに少しずつ戻す（AIMD）。
+    同時に送った複数のリクエストがまとめて 429 になることが多いので、
+    レートを落とすのは1回の輻輳につき1回だけにする。
+    """
+
+    def __init__(self, rpm=OPENAI_RPM, tpm=OPENAI_TPM, increase=0.05, decrease=0.5, min_rate=0.1):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.increase = increase
+        self.decrease = decrease
+        self.min_rate = min_rate
+        self.rate = 1.0
+        self.requests = float(rpm)
+        self.tokens = float(tpm)
+        self.updated = time.monotonic()
+        self.cooldown_until = 0.0
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.updated
+        self.updated = now
+        rpm = self.rpm * self.rate
+        tpm = self.tpm * self.rate
+        self.requests = min(rpm, self.requests + elapsed * rpm / 60)
+        self.tokens = min(tpm, self.tokens + elapsed * tpm / 60)
+
+    async def acquire(self, est_tokens):
+        async with self.lock:
+            while True:
+                self._refill()
+                # 1件で上限を超える見積もりでも永久に待たないよう、バケットの容量で頭打ちにする
+                need = min(est_tokens, self.tpm * self.rate)
+                if self.requests >= 1 and self.tokens >= need:
+                    self.requests -= 1
+                    self.tokens -= need
+                    return
+                wait = max(
+                    (1 - self.requests) * 60 / (self.rpm * self.rate),
+                    (need - self.tokens) * 60 / (self.tpm * self.rate),
+                )
+                await asyncio.sleep(wait)
+
+    def on_rate_limited(self, retry_after=None):
+        # 溜まっている分も捨てて、一旦送信を止める
+        self.requests = 0.0
+
+        # 直前の減速から Retry-After（最低1秒）以内の 429 は同じ輻輳とみなす
+        now = time.monotonic()
+        if now < self.cooldown_until:
+            return
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self.cooldown_until = now + max(retry_after or 0, 1.0)
+
+    def on_success(self):
+        self.rate = min(1.0, self.rate + self.increase)
+
+
+# 上限は API キー（組織）単位なので、キーごとに1つのバケットを全実行で共有する
+# （OpenAI クライアントと同じく、溜まり続けないよう件数と期限に上限を設ける）
+@st.cache_resource(max_entries=8, ttl=3600)
+def get_rate_limiter(api_key):
+    return TokenBucket()
+
+
+def retry_after_seconds(e):
+    # 429 レスポンスの Retry-After ヘッダ（秒）を読む。無い・不正なら None
+    try:
+        return float(e.response.headers["retry-after"])
+    except Exception:
+        return None
+
+
+# 非同期クライアントの接続はイベントループに紐づくため、asyncio.run で毎回ループを
+# 作り直すとプールを使い回せない。アプリ全体で1本のループをバックグラウンドで回し続ける
+@st.cache_resource
+def get_event_loop():
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+
+# 入力されたキーごとに作られるので、打ち間違いや他ユーザーのキーが溜まり続けないよう上限を設ける
+@st.cache_resource(max_entries=8, ttl=3600)
+def get_openai_client(api_key):
+    # リトライは tenacity 側で行うので SDK 内蔵のリトライは切る
+    return AsyncOpenAI(
+        api_key=api_key,
+        max_retries=0,
+        http_client=httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+            timeout=httpx.Timeout(60.0),
+        ),
+    )
+
+
 def generate_sns_schedule(df, days, tone, api_key):
-    time_slots = ["09:00", "12:00", "20:00"]
     today = datetime.today().date()
-    records = []
-
-    client = OpenAI(api_key=api_key) if api_key else None
-    post_iter = itertools.cycle(df.itertuples(index=False))
 
+    # 必要な列だけ配列にしておき、投稿は添字の剰余で循環させる
+    titles = df["タイトル"].to_numpy()
+    urls = df["URL"].to_numpy()
+    n = len(df)
+
+    if not api_key:
+        # AI を使わない場合はループせず、配列演算で一度に組み立てる
+        dates = pd.date_range(today, periods=days).strftime("%Y-%m-%d").to_numpy().repeat(len(TIME_SLOTS))
+        idx = np.arange(len(dates)) % n
+        return pd.DataFrame({
+            "datetime": dates + " " + np.tile(np.array(TIME_SLOTS, dtype=object), days),
+            "title": titles[idx],
+            "url": urls[idx],
+            "text": titles[idx] + "\n" + urls[idx],
+        })
+
+    client = get_openai_client(api_key)
+
+    # トーンは全投稿で共通なので、テンプレートはループの外で1回だけ組み立てる
+    prompt_tmpl = (
+        "\n記事タイトル: {title}\nURL: {url}\nトーン: "
+        + TONE_TEXT.get(tone, TONE_TEXT["カジュアル"])
+        + "\n自然な紹介文＋3つのハッシュタグ\n"
+    )
+
+    bucket = get_rate_limiter(api_key)
+
+    @retry(
+        wait=wait_random_exponential(min=1, max=30),
+        stop=stop_after_attempt(5),
+        retry=retry_if_exception_type((openai.RateLimitError, openai.APIConnectionError)),
+        reraise=True,
+    )
+    async def create_completion(prompt):
+        await bucket.acquire(estimate_tokens(prompt))
+        try:
+            res = await client.chat.completions.create(
+                model="gpt-4.1-mini",
+                messages=[
+                    SYSTEM_MSG,
+                    {"role": "user", "content": prompt},
+                ],
+            )
+        except openai.RateLimitError as e:
+            delay = retry_after_seconds(e)
+            bucket.on_rate_limited(delay)
+            if delay:
+                await asyncio.sleep(delay)
+            raise
+        bucket.on_success()
+        return res
+
+    async def gen_text(sem, title, url):
+        prompt = prompt_tmpl.format(title=title, url=url)
+        try:
+            async with sem:
+                res = await create_completion(prompt)
+            return res.choices[0].message.content.strip()
+        except Exception:
+            return f"[AI生成エラー] {title}"
+
+    async def gen_all(keys):
+        # 同時リクエスト数を制限しつつ並列で生成（gather は投入順に結果を返す）
+        sem = asyncio.Semaphore(20)
+        return await asyncio.gather(*(gen_text(sem, title, url) for title, url in keys))
+
+    slots = []
+    idx = 0
     for d in range(days):
         date = today + timedelta(days=d)
-        for t in time_slots:
-            p = next(post_iter)
-
-            if client:
-                tone_text = "丁寧で落ち着いたトーン" if tone == "丁寧" else "カジュアルで親しみやすいトーン"
-                prompt = f"""
-記事タイトル: {p.タイトル}
-URL: {p.URL}
-トーン: {tone_text}
-自然な紹介文＋3つのハッシュタグ
-"""
-                try:
-                    res = client.chat.completions.create(
-                        model="gpt-4.1-mini",
-                        messages=[
-                            {"role": "system", "content": "あなたは優秀なSNSライターです"},
-                            {"role": "user", "content": prompt},
-                        ],
-                    )
-                    text = res.choices[0].message.content.strip()
-                except Exception:
-                    text = f"[AI生成エラー] {p.タイトル}"
-            else:
-                text = f"{p.タイトル}\n{p.URL}"
-
-            records.append({
-                "datetime": f"{date} {t}",
-                "title": p.タイトル,
-                "url": p.URL,
-                "text": text,
-            })
-
+        for t in TIME_SLOTS:
+            slots.append((f"{date} {t}", titles[idx % n], urls[idx % n]))
+            idx += 1
+
+    # 投稿数より枠が多いと同じ記事が何度も回ってくるので、
+    # 同一の (タイトル, URL) は1回だけ生成して使い回す
+    keys = list(dict.fromkeys((title, url) for _, title, url in slots))
+    texts = asyncio.run_coroutine_threadsafe(gen_all(keys), get_event_loop()).result()
+    text_by_key = dict(zip(keys, texts))
+
+    records = [
+        {
+            "datetime": dt,
+            "title": title,
+            "url": url,
+            "text": text_by_key[(title, url)],
+        }
+        for dt, title, url in slots
+    ]
     return pd.DataFrame(records)
 
 
 # ============================================================
 # メインアプリ
 # ============================================================
+# 各タブは st.fragment にして、タブ内の操作ではそのタブだけを再実行する
+@st.fragment
+def show_wp_tab():
+    st.subheader("WordPress 投稿取得")
+
+    wp_url = st.text_input("WordPress URL")
+    wp_user = st.text_input("WPユーザー名")
+    wp_pass = st.text_input("WPアプリケーションパスワード", type="password")
+    with_char_count = st.checkbox("本文の文字数も取得する（オフにすると取得が速くなります）", value=True)
+
+    if st.button("投稿を取得する"):
+        df, error = fetch_wp_posts(wp_url, wp_user, wp_pass, with_char_count)
+        if error:
+            st.error(error)
+        else:
+            st.session_state.posts = df
+            st.session_state.posts_fetched = True
+            # フラグメントの再実行では他のタブが更新されないので、アプリ全体を再実行する
+            st.rerun()
+
+    if st.session_state.pop("posts_fetched", False):
+        st.success("取得成功！")
+    if "posts" in st.session_state:
+        st.dataframe(st.session_state.posts)
+
+
+@st.fragment
+def show_sheets_tab():
+    st.subheader("Google Sheets 出力")
+
+    if "posts" not in st.session_state:
+        st.info("❗ まず投稿を取得してください")
+        return
+
+    sheet_id = st.text_input("スプレッドシートID")
+    worksheet = st.text_input("ワークシート名", "WP_Posts")
+
+    if st.button("Sheetsに書き込む"):
+        ok = write_to_sheets(st.session_state.posts, sheet_id, worksheet)
+        if ok:
+            st.success("Sheets 書き込み成功！")
+
+
+@st.fragment
+def show_sns_tab():
+    st.subheader("SNS CSV生成")
+
+    if "posts" not in st.session_state:
+        st.info("❗ まず投稿を取得してください")
+        return
+
+    days = st.number_input("生成日数", min_value=1, max_value=365, value=30)
+    tone = st.radio("トーン", ["丁寧", "カジュアル"])
+    api_key = st.text_input("OpenAI API Key（任意）", type="password")
+
+    if st.button("CSV生成"):
+        df_csv = generate_sns_schedule(st.session_state.posts, days, tone, api_key)
+        # str → bytes の二重コピーを避け、BytesIO へ直接エンコードして書き出す
+        buf = io.BytesIO()
+        df_csv.to_csv(buf, index=False, encoding="utf-8-sig")
+        st.download_button(
+            "CSVをダウンロード",
+            buf,
+            "sns.csv",
+            mime="text/csv",
+        )
+
+
 def show_main_app(user):
     st.sidebar.success(f"ログイン中: {user.get('email', 'ユーザー')}")
 
@@ -224,50 +592,13 @@ def show_main_app(user):
     tab1, tab2, tab3 = st.tabs(["① WP取得", "② Sheets出力", "③ SNS CSV"])
 
     with tab1:
-        st.subheader("WordPress 投稿取得")
-
-        wp_url = st.text_input("WordPress URL")
-        wp_user = st.text_input("WPユーザー名")
-        wp_pass = st.text_input("WPアプリケーションパスワード", type="password")
-
-        if st.button("投稿を取得する"):
-            df = fetch_wp_posts(wp_url, wp_user, wp_pass)
-            if df is not None:
-                st.session_state.posts = df
-                st.success("取得成功！")
-                st.dataframe(df)
+        show_wp_tab()
 
     with tab2:
-        st.subheader("Google Sheets 出力")
-
-        if "posts" not in st.session_state:
-            st.info("❗ まず投稿を取得してください")
-        else:
-            sheet_id = st.text_input("スプレッドシートID")
-            worksheet = st.text_input("ワークシート名", "WP_Posts")
-
-            if st.button("Sheetsに書き込む"):
-                ok = write_to_sheets(st.session_state.posts, sheet_id, worksheet)
-                if ok:
-                    st.success("Sheets 書き込み成功！")
+        show_sheets_tab()
 
     with tab3:
-        st.subheader("SNS CSV生成")
-
-        if "posts" not in st.session_state:
-            st.info("❗ まず投稿を取得してください")
-        else:
-            days = st.number_input("生成日数", min_value=1, max_value=365, value=30)
-            tone = st.radio("トーン", ["丁寧", "カジュアル"])
-            api_key = st.text_input("OpenAI API Key（任意）", type="password")
-
-            if st.button("CSV生成"):
-                df_csv = generate_sns_schedule(st.session_state.posts, days, tone, api_key)
-                st.download_button(
-                    "CSVをダウンロード",
-                    df_csv.to_csv(index=False).encode("utf-8-sig"),
-                    "sns.csv"
-                )
+        show_sns_tab()
 
 
 # ============================================================